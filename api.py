@@ -1,24 +1,84 @@
 
 from __future__ import annotations
+import logging
 import os
 import datetime
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI, Query, HTTPException
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import orjson
+from fastapi import FastAPI, Query, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import db
 import scraper
 
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-app = FastAPI()
+
+def _json_default(value: Any) -> Any:
+    """orjson fallback for column types it cannot serialize natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class JSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default)
+
+
+def json_response(data: Any) -> Response:
+    """
+    Encode with orjson and hand FastAPI a finished Response, so neither
+    jsonable_encoder nor response_model validation touches the payload.
+    If a route gains a response_model, build the model with
+    model_construct() and still return it through here.
+    """
+    return Response(content=orjson.dumps(data, default=_json_default), media_type="application/json")
+
+
+app = FastAPI(default_response_class=JSONResponse)
+# /api/past and /api/previous-days repeat the same keys on every row; small bodies stay uncompressed.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+SITE_URL = os.getenv("SITE_URL", "https://kolkataff.tv/")
+
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+# Results change a few times a day; serve repeat reads of the "latest" views
+# from memory for a short window instead of hitting MySQL on every request.
+CACHE_TTL_S = float(os.getenv("API_CACHE_TTL", "30"))
+_CACHE: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
+
+
+async def _cached(key: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+    """Cache hits return on the event loop; only misses take a threadpool slot."""
+    now = time.monotonic()
+    hit = _CACHE.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+    value = await run_in_threadpool(loader)
+    if len(_CACHE) >= 8:
+        _CACHE.clear()
+    _CACHE[key] = (now + CACHE_TTL_S, value)
+    return value
 
 
 @app.on_event("startup")
 def init_db() -> None:
-    """Ensure the SQLite schema exists when the API starts."""
+    """Ensure the MySQL schema exists when the API starts."""
     db.init_db()
+    db.migrate_signatures(scraper.compute_signature)
 
 
 @app.get("/health")
-def health() -> Dict[str, bool]:
+async def health() -> Dict[str, bool]:
     return {"ok": True}
 
 
@@ -33,83 +93,104 @@ def debug_db() -> Dict[str, Any]:
 
 
 
-# Returns the latest single result (unchanged)
-@app.get("/api/latest")
-def latest() -> Optional[Dict[str, Any]]:
-    result = db.get_latest_result()
-    if result:
-        return result
+def _scrape_latest_into_db() -> bool:
+    """Cold start: scrape the newest result into an empty DB. Blocking."""
     try:
         scraped = scraper.fetch_latest_result()
         db.insert_result(
-            source=os.getenv("SITE_URL", "https://kolkataff.tv/"),
+            source=SITE_URL,
             draw_date=scraped["draw_date"],
             draw_time=scraped.get("draw_time") or None,
             result_text=scraped["result_text"],
             signature=scraped["signature"],
         )
     except Exception:
-        return None
-    return db.get_latest_result()
-
+        return False
+    return True
 
 
-# Returns all results for today only, in custom format
-@app.get("/api/latest-day")
-def latest_day() -> dict:
-    today = datetime.date.today().strftime("%Y-%m-%d")
-    results = db.get_results_by_date(today)
-    # Prepare sections (always 8)
-    sections = []
-    for i in range(8):
-        if i < len(results):
-            r = results[i]
-            field1, field2 = "-", "-"
-            time = r.get("draw_time", "-")
-            if "result_text" in r and "-" in r["result_text"]:
-                parts = r["result_text"].split("-")
-                if len(parts) == 2:
-                    field1, field2 = parts[0].strip(), parts[1].strip()
-            sections.append({"number": i+1, "field1": field1, "field2": field2, "time": time})
-        else:
-            sections.append({"number": i+1, "field1": "-", "field2": "-", "time": "-"})
-    # Format date
-    dateFormatted = datetime.date.today().strftime("%A, %d %B %Y")
-    return {
+# Returns the latest single result (unchanged)
+@app.get("/api/latest")
+async def latest() -> Optional[Dict[str, Any]]:
+    result = await _cached(("latest",), db.get_latest_result)
+    if result:
+        return json_response(result)
+    if not await run_in_threadpool(_scrape_latest_into_db):
+        return json_response(None)
+    _CACHE.clear()
+    return json_response(await run_in_threadpool(db.get_latest_result))
+
+
+
+def _latest_day_body(today_obj: datetime.date) -> bytes:
+    """Build and encode the /api/latest-day payload; cached as bytes by the handler."""
+    today = today_obj.isoformat()
+    results = db.get_sections_by_date(today, 8)
+    # Prepare sections (always 8); rows arrive split and defaulted by SQL
+    sections = [
+        {"number": i, "field1": field1, "field2": field2, "time": draw_time}
+        for i, (draw_time, field1, field2) in enumerate(results, 1)
+    ]
+    sections += [
+        {"number": i, "field1": "-", "field2": "-", "time": "-"}
+        for i in range(len(sections) + 1, 9)
+    ]
+    # Format date; same output as strftime("%A, %d %B %Y") in the C locale, without the libc call
+    dateFormatted = (
+        f"{_WEEKDAYS[today_obj.weekday()]}, {today_obj.day:02d} "
+        f"{_MONTHS[today_obj.month - 1]} {today_obj.year}"
+    )
+    return orjson.dumps({
         "success": True,
         "date": today,
         "dateFormatted": dateFormatted,
         "sections": sections
-    }
+    })
+
+
+# Returns all results for today only, in custom format
+@app.get("/api/latest-day")
+async def latest_day() -> Response:
+    today_obj = datetime.date.today()
+    body = await _cached(("day", today_obj.isoformat()), lambda: _latest_day_body(today_obj))
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/api/past")
-def past(days: int = Query(60, ge=1, le=365)) -> List[Dict[str, Any]]:
-    return db.get_past_results(days=days)
+async def past(days: int = Query(60, ge=1, le=365)) -> List[Dict[str, Any]]:
+    return json_response(await run_in_threadpool(db.get_past_results, days))
 
 
 @app.get("/api/by-date")
-def by_date(date: str = Query(..., regex=r"\d{4}-\d{2}-\d{2}")) -> List[Dict[str, Any]]:
-    return db.get_results_by_date(date)
+async def by_date(date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$")) -> List[Dict[str, Any]]:
+    try:
+        datetime.date.fromisoformat(date)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"invalid date: {date}")
+    return json_response(await run_in_threadpool(db.get_results_by_date, date))
 
 
 @app.get("/api/previous-days")
-def previous_days(days: int = Query(7, ge=1, le=365)) -> dict:
+async def previous_days(days: int = Query(7, ge=1, le=365)) -> dict:
     try:
-        results_by_date = {}
-        
-        for i in range(1, days + 1):
-            date_obj = datetime.date.today() - datetime.timedelta(days=i)
-            date_str = date_obj.strftime("%Y-%m-%d")
-            results = db.get_results_by_date(date_str)
-            if results:
-                results_by_date[date_str] = results
-        
-        return {
+        today = datetime.date.today()
+        wanted = {
+            (today - datetime.timedelta(days=i)).isoformat()
+            for i in range(1, days + 1)
+        }
+        # One range query instead of one round-trip per day; rows arrive
+        # newest date first, so grouping keeps the previous key order.
+        rows = await run_in_threadpool(db.get_results_between, min(wanted), max(wanted))
+        results_by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            if row["draw_date"] in wanted:
+                results_by_date.setdefault(row["draw_date"], []).append(row)
+
+        return json_response({
             "success": True,
             "days_requested": days,
             "data": results_by_date
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,152 +1,199 @@
 from __future__ import annotations
 
-
+import json
+import logging
 import mysql.connector
+import mysql.connector.pooling
+import threading
 import time
 import os
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+LOGGER = logging.getLogger("kolkataff.db")
+_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+_POOL: Optional[mysql.connector.pooling.MySQLConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+# Hot statements live here so every call sends byte-identical SQL text.
+# Readers list the API columns explicitly; field1/field2 are internal.
+_COLUMNS = "id, source, draw_date, draw_time, result_text, signature, created_at"
+_COLUMN_KEYS = tuple(name.strip() for name in _COLUMNS.split(","))
+_FETCH_BATCH = 256
+# A duplicate signature is a no-op update (rowcount 0) rather than an IntegrityError;
+# this relies on the connector's default flags (no CLIENT_FOUND_ROWS).
+_INSERT_SQL = (
+    "INSERT INTO results (source, draw_date, draw_time, result_text, field1, field2, signature, created_at) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE id = id"
+)
+_LATEST_SQL = f"SELECT {_COLUMNS} FROM results ORDER BY created_at DESC LIMIT 1"
+_COUNT_SQL = "SELECT COUNT(*) FROM results"
+_PAST_SQL = f"SELECT {_COLUMNS} FROM results WHERE created_at >= %s ORDER BY created_at DESC"
+_BY_DATE_SQL = f"SELECT {_COLUMNS} FROM results WHERE draw_date = %s ORDER BY created_at DESC"
+_SECTIONS_SQL = (
+    "SELECT draw_time, COALESCE(field1, '-'), COALESCE(field2, '-') FROM results WHERE draw_date = %s "
+    "ORDER BY created_at DESC LIMIT %s"
+)
+_DATE_RANGE_SQL = (
+    f"SELECT {_COLUMNS} FROM results WHERE draw_date BETWEEN %s AND %s "
+    "ORDER BY draw_date DESC, created_at DESC"
+)
+_CLEANUP_SQL = "DELETE FROM results WHERE created_at < %s"
+_HTTP_CACHE_GET_SQL = "SELECT etag, last_modified, body_sha FROM http_cache WHERE url = %s"
+_HTTP_CACHE_SAVE_SQL = (
+    "INSERT INTO http_cache (url, etag, last_modified, body_sha) VALUES (%s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE etag = VALUES(etag), last_modified = VALUES(last_modified), "
+    "body_sha = VALUES(body_sha)"
+)
+
+
+def log_event(level: int, message: str, **fields: Any) -> None:
+    # insert_result logs per row; skip the JSON encode when nobody listens.
+    if not LOGGER.isEnabledFor(level):
+        return
+    LOGGER.log(level, _ENCODE({"message": message, **fields}))
+
+
+def _connection_config() -> Dict[str, Any]:
+    return {
+        "host": os.getenv("MYSQL_HOST"),
+        "user": os.getenv("MYSQL_USER"),
+        "password": os.getenv("MYSQL_PASSWORD"),
+        "database": os.getenv("MYSQL_DATABASE"),
+        "port": int(os.getenv("MYSQL_PORT", "3306")),
+    }
+
 
 def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DATABASE"),
-        port=int(os.getenv("MYSQL_PORT", "3306")),
-    )
-
-def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS results (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            source VARCHAR(255) NOT NULL,
-            draw_date VARCHAR(20) NOT NULL,
-            draw_time VARCHAR(20),
-            result_text VARCHAR(255) NOT NULL,
-            signature VARCHAR(255) NOT NULL UNIQUE,
-            created_at BIGINT NOT NULL
-        )
-        """
-    )
-    try:
-        cursor.execute("CREATE INDEX idx_results_draw_date ON results(draw_date)")
-    except Exception:
-        pass
+    """
+    Borrow a connection from the module-level pool (built on first use).
+    close() on a pooled connection hands it back instead of disconnecting.
+    If every pooled connection is busy, fall back to a one-off connection
+    rather than failing the request.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="kff",
+                    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+                    pool_reset_session=False,
+                    **_connection_config(),
+                )
     try:
-        cursor.execute("CREATE INDEX idx_results_created_at ON results(created_at)")
-    except Exception:
-        pass
-    conn.commit()
-    cursor.close()
-    conn.close()
+        return _POOL.get_connection()
+    except mysql.connector.errors.PoolError:
+        return mysql.connector.connect(**_connection_config())
 
-def insert_result(
-    source: str,
-    draw_date: str,
-    draw_time: Optional[str],
-    result_text: str,
-    signature: str,
-    created_at: Optional[int] = None,
-) -> bool:
-    created_at = created_at or int(time.time())
-    print(f"[DEBUG] Attempting to insert result: source={source}, draw_date={draw_date}, draw_time={draw_time}, result_text={result_text}, signature={signature}, created_at={created_at}")
+
+@contextmanager
+def _cursor() -> Iterator[Tuple[Any, Any]]:
+    """
+    Yield (connection, cursor); both are released even if the query raises.
+    Pooled connections are not reset on checkout, so any transaction left
+    open (reads, failed writes) is rolled back here; otherwise the next
+    borrower would keep reading the old InnoDB snapshot.
+    """
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            """
-            INSERT INTO results (source, draw_date, draw_time, result_text, signature, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (source, draw_date, draw_time, result_text, signature, created_at),
-        )
-        conn.commit()
-        print(f"[DEBUG] Inserted result successfully: signature={signature}")
-        return True
-    except mysql.connector.IntegrityError:
-        print(f"[DEBUG] Duplicate result detected, not inserted: signature={signature}")
-        return False
+        yield conn, cursor
     finally:
         cursor.close()
+        if conn.in_transaction:
+            conn.rollback()
         conn.close()
 
-def get_latest_result() -> Optional[Dict[str, Any]]:
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM results ORDER BY created_at DESC LIMIT 1")
-    row = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return row if row else None
 
-def get_row_count() -> int:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM results")
-    count = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
-    return count
+def init_db() -> None:
+    with _cursor() as (conn, cursor):
+        try:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    source VARCHAR(255) NOT NULL,
+                    draw_date VARCHAR(20) NOT NULL,
+                    draw_time VARCHAR(20),
+                    result_text VARCHAR(255) NOT NULL,
+                    field1 VARCHAR(255),
+                    field2 VARCHAR(255),
+                    signature VARCHAR(255) NOT NULL UNIQUE,
+                    created_at BIGINT NOT NULL
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """
+            )
+            # MySQL does not support CREATE INDEX IF NOT EXISTS until v8.0. So check if index exists first.
+            # (draw_date, created_at) serves both the WHERE and the ORDER BY of the
+            # by-date/latest-day reads without a filesort; MySQL < 8 ignores DESC
+            # and scans the index backwards instead.
+            cursor.execute("SHOW INDEX FROM results WHERE Key_name = 'idx_results_date_created'")
+            if not cursor.fetchall():
+                cursor.execute(
+                    "CREATE INDEX idx_results_date_created ON results(draw_date, created_at DESC)"
+                )
+                log_event(logging.INFO, "index_created", index="idx_results_date_created")
+            # The composite index's draw_date prefix makes the single-column one redundant.
+            cursor.execute("SHOW INDEX FROM results WHERE Key_name = 'idx_results_draw_date'")
+            if cursor.fetchall():
+                cursor.execute("DROP INDEX idx_results_draw_date ON results")
+                log_event(logging.INFO, "index_dropped", index="idx_results_draw_date")
+            cursor.execute("SHOW INDEX FROM results WHERE Key_name = 'idx_results_created_at'")
+            if not cursor.fetchall():
+                cursor.execute("CREATE INDEX idx_results_created_at ON results(created_at)")
+                log_event(logging.INFO, "index_created", index="idx_results_created_at")
+            # Tables created before field1/field2 existed: add and backfill them.
+            cursor.execute("SHOW COLUMNS FROM results LIKE 'field1'")
+            if not cursor.fetchone():
+                cursor.execute(
+                    "ALTER TABLE results ADD COLUMN field1 VARCHAR(255) AFTER result_text, "
+                    "ADD COLUMN field2 VARCHAR(255) AFTER field1"
+                )
+                cursor.execute(
+                    """
+                    UPDATE results
+                    SET field1 = TRIM(SUBSTRING_INDEX(result_text, '-', 1)),
+                        field2 = TRIM(SUBSTRING_INDEX(result_text, '-', -1))
+                    WHERE result_text LIKE '%-%' AND result_text NOT LIKE '%-%-%'
+                    """
+                )
+                log_event(logging.INFO, "columns_added", columns="field1,field2", backfilled=cursor.rowcount)
+            # Validators and body hash from each source's last parsed 200 response.
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url VARCHAR(255) NOT NULL PRIMARY KEY,
+                    etag VARCHAR(255),
+                    last_modified VARCHAR(64),
+                    body_sha CHAR(64)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """
+            )
+            conn.commit()
+        except Exception as e:
+            log_event(logging.ERROR, "init_db_failed", error=str(e))
+            raise
 
-def get_past_results(days: int) -> List[Dict[str, Any]]:
-    cutoff = int(time.time()) - days * 86400
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM results WHERE created_at >= %s ORDER BY created_at DESC", (cutoff,))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return rows
 
-def get_results_by_date(date: str) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM results WHERE draw_date = %s ORDER BY STR_TO_DATE(draw_time, '%H:%i') ASC", (date,))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return rows
+def _split_result_text(result_text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Split a "patti-single" pair such as "120-3"; anything else yields (None, None)."""
+    parts = result_text.split("-")
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return None, None
 
 
-def init_db() -> None:
-    print("[DEBUG] Running init_db() for MySQL...")
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS results (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                source VARCHAR(255) NOT NULL,
-                draw_date VARCHAR(20) NOT NULL,
-                draw_time VARCHAR(20),
-                result_text VARCHAR(255) NOT NULL,
-                signature VARCHAR(255) NOT NULL UNIQUE,
-                created_at BIGINT NOT NULL
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """
-        )
-        print("[DEBUG] Table creation attempted.")
-        # MySQL does not support CREATE INDEX IF NOT EXISTS until v8.0. So check if index exists first.
-        cursor.execute("SHOW INDEX FROM results WHERE Key_name = 'idx_results_draw_date'")
-        if not cursor.fetchone():
-            cursor.execute("CREATE INDEX idx_results_draw_date ON results(draw_date)")
-            print("[DEBUG] Created idx_results_draw_date index.")
-        cursor.execute("SHOW INDEX FROM results WHERE Key_name = 'idx_results_created_at'")
-        if not cursor.fetchone():
-            cursor.execute("CREATE INDEX idx_results_created_at ON results(created_at)")
-            print("[DEBUG] Created idx_results_created_at index.")
-        conn.commit()
-        print("[DEBUG] init_db() completed successfully.")
-    except Exception as e:
-        print(f"[ERROR] init_db failed: {e}")
-        raise
-    finally:
-        cursor.close()
-        conn.close()
+def reset_db() -> None:
+    """
+    Empty results and http_cache so the next scrape replays every draw.
+    TRUNCATE recreates the tables instead of logging a per-row DELETE.
+    """
+    with _cursor() as (_, cursor):
+        cursor.execute("TRUNCATE TABLE results")
+        cursor.execute("TRUNCATE TABLE http_cache")
 
 
 def insert_result(
@@ -158,80 +205,159 @@ def insert_result(
     created_at: Optional[int] = None,
 ) -> bool:
     created_at = created_at or int(time.time())
-    print(f"[DEBUG] Attempting to insert result: source={source}, draw_date={draw_date}, draw_time={draw_time}, result_text={result_text}, signature={signature}, created_at={created_at}")
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    field1, field2 = _split_result_text(result_text)
+    with _cursor() as (conn, cursor):
         cursor.execute(
-            """
-            INSERT INTO results (source, draw_date, draw_time, result_text, signature, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (source, draw_date, draw_time, result_text, signature, created_at),
+            _INSERT_SQL,
+            (source, draw_date, draw_time, result_text, field1, field2, signature, created_at),
         )
+        inserted = cursor.rowcount == 1
         conn.commit()
-        print(f"[DEBUG] Inserted result successfully: signature={signature}")
-        return True
-    except mysql.connector.IntegrityError:
-        print(f"[DEBUG] Duplicate result detected, not inserted: signature={signature}")
-        return False
-    finally:
-        cursor.close()
-        conn.close()
+    log_event(logging.DEBUG, "result_inserted" if inserted else "result_duplicate", signature=signature)
+    return inserted
+
+
+def insert_results(source: str, rows: List[Dict[str, Any]], created_at: Optional[int] = None) -> List[bool]:
+    """
+    Insert parsed results (draw_date, draw_time, result_text, signature) in one
+    transaction and return, per row, whether it was newly inserted.
+    Known signatures are looked up first so the new rows go out as a single
+    multi-row INSERT; the upsert clause still absorbs any concurrent duplicate.
+    """
+    if not rows:
+        return []
+    created_at = created_at or int(time.time())
+    signatures = [row["signature"] for row in rows]
+    placeholders = ", ".join(["%s"] * len(signatures))
+    with _cursor() as (conn, cursor):
+        cursor.execute(f"SELECT signature FROM results WHERE signature IN ({placeholders})", signatures)
+        seen = {signature for (signature,) in cursor.fetchall()}
+        flags: List[bool] = []
+        params = []
+        for row in rows:
+            is_new = row["signature"] not in seen
+            flags.append(is_new)
+            if not is_new:
+                continue
+            seen.add(row["signature"])
+            field1, field2 = _split_result_text(row["result_text"])
+            params.append((
+                source,
+                row["draw_date"],
+                row.get("draw_time") or None,
+                row["result_text"],
+                field1,
+                field2,
+                row["signature"],
+                created_at,
+            ))
+        if params:
+            cursor.executemany(_INSERT_SQL, params)
+            conn.commit()
+    log_event(logging.DEBUG, "results_batch", rows=len(rows), inserted=len(params))
+    return flags
 
 
 def cleanup_old(retention_days: int) -> int:
     cutoff = int(time.time()) - retention_days * 86400
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM results WHERE created_at < %s", (cutoff,))
-    deleted = cursor.rowcount
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with _cursor() as (conn, cursor):
+        cursor.execute(_CLEANUP_SQL, (cutoff,))
+        deleted = cursor.rowcount
+        conn.commit()
     if deleted:
         log_event(logging.INFO, "cleanup_deleted", deleted=deleted)
     return deleted
 
 
-
-
 def get_latest_result() -> Optional[Dict[str, Any]]:
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM results ORDER BY created_at DESC LIMIT 1")
-    row = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return row if row else None
+    with _cursor() as (_, cursor):
+        cursor.execute(_LATEST_SQL)
+        row = cursor.fetchone()
+    return dict(zip(_COLUMN_KEYS, row)) if row else None
 
 
 def get_row_count() -> int:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM results")
-    count = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
-    return count
+    with _cursor() as (_, cursor):
+        cursor.execute(_COUNT_SQL)
+        return cursor.fetchone()[0]
+
+
+def _fetch_rows(cursor: Any) -> List[Dict[str, Any]]:
+    """
+    Drain a plain (tuple) cursor selecting _COLUMNS in batches and zip rows
+    into dicts; cheaper than a dictionary cursor for large result sets.
+    """
+    keys = _COLUMN_KEYS
+    rows: List[Dict[str, Any]] = []
+    batch = cursor.fetchmany(_FETCH_BATCH)
+    while batch:
+        rows.extend([dict(zip(keys, row)) for row in batch])
+        batch = cursor.fetchmany(_FETCH_BATCH)
+    return rows
 
 
 def get_past_results(days: int) -> List[Dict[str, Any]]:
     cutoff = int(time.time()) - days * 86400
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM results WHERE created_at >= %s ORDER BY created_at DESC", (cutoff,))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return rows
+    with _cursor() as (_, cursor):
+        cursor.execute(_PAST_SQL, (cutoff,))
+        return _fetch_rows(cursor)
 
 
 def get_results_by_date(date: str) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM results WHERE draw_date = %s ORDER BY created_at DESC", (date,))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return rows
+    with _cursor() as (_, cursor):
+        cursor.execute(_BY_DATE_SQL, (date,))
+        return _fetch_rows(cursor)
+
+
+def get_sections_by_date(date: str, limit: int) -> List[Tuple[Optional[str], str, str]]:
+    """
+    (draw_time, field1, field2) of the newest `limit` rows for a day; the
+    halves were split at insert and come back as "-" when absent.
+    """
+    with _cursor() as (_, cursor):
+        cursor.execute(_SECTIONS_SQL, (date, limit))
+        return cursor.fetchall()
+
+
+def get_results_between(start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """Rows with start_date <= draw_date <= end_date (YYYY-MM-DD), newest date first."""
+    with _cursor() as (_, cursor):
+        cursor.execute(_DATE_RANGE_SQL, (start_date, end_date))
+        return _fetch_rows(cursor)
+
+
+def get_http_cache(url: str) -> Optional[Dict[str, Optional[str]]]:
+    """Stored ETag/Last-Modified and body hash for a source URL, if any."""
+    with _cursor() as (_, cursor):
+        cursor.execute(_HTTP_CACHE_GET_SQL, (url,))
+        row = cursor.fetchone()
+    return {"etag": row[0], "last_modified": row[1], "body_sha": row[2]} if row else None
+
+
+def save_http_cache(
+    url: str, etag: Optional[str], last_modified: Optional[str], body_sha: Optional[str]
+) -> None:
+    with _cursor() as (conn, cursor):
+        cursor.execute(_HTTP_CACHE_SAVE_SQL, (url, etag, last_modified, body_sha))
+        conn.commit()
+
+
+def migrate_signatures(compute: Callable[[str, Optional[str], str], str]) -> int:
+    """
+    Rewrite stored signatures that were made by an older signature scheme.
+    `compute` is scraper.compute_signature; rows whose signature length differs
+    from its output are rehashed so re-scraped draws still hit the UNIQUE key.
+    """
+    length = len(compute("", None, ""))
+    with _cursor() as (conn, cursor):
+        cursor.execute(
+            "SELECT id, draw_date, draw_time, result_text FROM results WHERE CHAR_LENGTH(signature) <> %s",
+            (length,),
+        )
+        updates = [(compute(d, t, r), row_id) for row_id, d, t, r in cursor.fetchall()]
+        if updates:
+            cursor.executemany("UPDATE results SET signature = %s WHERE id = %s", updates)
+            conn.commit()
+    if updates:
+        log_event(logging.INFO, "signatures_migrated", rows=len(updates))
+    return len(updates)
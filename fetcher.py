@@ -5,21 +5,36 @@ import logging
 import os
 import sys
 import datetime
-import time
+import hashlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional, Tuple
 
 import db
 import scraper
-import telegram
 
 LOGGER = logging.getLogger("kolkataff.fetcher")
 logging.basicConfig(level=logging.INFO, format="%(message)s")
+_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# Environment is read once at import; each cron run is a fresh process.
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "60"))
+DATA_DIR = Path(os.getenv("DATA_DIR", "/data"))
+SAVE_HTML = os.getenv("SAVE_HTML", "0") == "1"
+RESET_DB_ON_START = os.getenv("RESET_DB_ON_START") == "1"
+# Pins scraping to one site; unset means the built-in mirror list.
+SITE_URL_OVERRIDE = os.getenv("SITE_URL")
+_DATA_DIR_READY = False
+# Head start each mirror gets before the next one is tried in parallel; 0 races them all at once.
+# Each run is a fresh process paying DNS/TCP/TLS setup, so this sits above a normal cold fetch:
+# a healthy primary answers alone and the other mirrors are only hit when it is slow or down.
+MIRROR_HEDGE_DELAY_S = float(os.getenv("MIRROR_HEDGE_DELAY", "2.0"))
 
 
 def log_event(level: int, message: str, **fields: Any) -> None:
-    payload = {"message": message, **fields}
-    LOGGER.log(level, json.dumps(payload, ensure_ascii=False))
+    if not LOGGER.isEnabledFor(level):
+        return
+    LOGGER.log(level, _ENCODE({"message": message, **fields}))
 
 
 def format_message(draw_date: str, draw_time: str | None, result_text: str) -> str:
@@ -30,17 +45,63 @@ def format_message(draw_date: str, draw_time: str | None, result_text: str) -> s
     return "\n".join(lines)
 
 
-def scrape_with_fallback() -> tuple[str, list[dict[str, str]]]:
+# (etag, last_modified, body_sha) for db.save_http_cache
+CacheEntry = Tuple[Optional[str], Optional[str], str]
+
+
+def _save_html(body: bytes) -> None:
+    """SAVE_HTML debug snapshot of the page main() actually used."""
+    global _DATA_DIR_READY
+    if not _DATA_DIR_READY:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        _DATA_DIR_READY = True
+    (DATA_DIR / "last_fetch.html").write_bytes(body)
+
+
+def _scrape_source(url: str) -> tuple[list[dict[str, str]], CacheEntry | None, bytes | None]:
+    """
+    Conditionally fetch and parse one source. An unchanged page (HTTP 304,
+    or a 200 whose body hashes the same as the last parsed one) yields no
+    results, so main() skips parsing and inserting altogether.
+    Returns (results, cache entry, body). Neither the entry nor the body is
+    saved here: main() records them only for the source it used (the entry
+    once its rows are committed), so a failed insert or a losing mirror never
+    marks a page as handled or overwrites the snapshot.
+    """
+    cached = db.get_http_cache(url) or {}
+    try:
+        html, charset, etag, last_modified = scraper.fetch_html_conditional(
+            url, etag=cached.get("etag"), last_modified=cached.get("last_modified")
+        )
+    except scraper.NotModified:
+        log_event(logging.INFO, "source_not_modified", source=url)
+        return [], None, None
+    # Many servers ignore validators; an identical body is just as unchanged.
+    body_sha = hashlib.sha256(html).hexdigest()
+    if body_sha == cached.get("body_sha"):
+        log_event(logging.INFO, "source_unchanged", source=url)
+        return [], None, html
+    return scraper.parse_results(html, charset), (etag, last_modified, body_sha), html
+
+
+def scrape_with_fallback() -> tuple[str, list[dict[str, str]], CacheEntry | None, bytes | None]:
     """
     Try multiple sources so a single 502/host outage doesn't stop inserts.
     Priority:
       1) Explicit SITE_URL if provided
       2) Known mirrors (tv -> in -> net)
+    Mirrors are hedged rather than tried strictly in turn: each one gets
+    MIRROR_HEDGE_DELAY_S to answer before the next starts in parallel (or
+    immediately, once it has failed), and the first parsed page wins.
+    A slow or hanging primary no longer delays the result by its full timeout,
+    but the process still waits for its thread at exit (bounded by the fetch
+    timeout and retries).
+    With MIRROR_HEDGE_DELAY=0 all mirrors start together; a pinned SITE_URL
+    is fetched directly on the calling thread.
     """
-    env_site = os.getenv("SITE_URL")
     candidates = (
-        [env_site]
-        if env_site
+        [SITE_URL_OVERRIDE]
+        if SITE_URL_OVERRIDE
         else [
             "https://kolkataff.tv/",
             "https://kolkataff.in/",
@@ -48,51 +109,55 @@ def scrape_with_fallback() -> tuple[str, list[dict[str, str]]]:
         ]
     )
 
+    if len(candidates) == 1:
+        # Pinned SITE_URL: nothing to race, so skip the thread pool.
+        return (candidates[0], *_scrape_source(candidates[0]))
+
     last_error: str | None = None
-    for url in candidates:
-        try:
-            html = scraper.fetch_html(url)
-            if os.getenv("SAVE_HTML", "0") == "1":
-                data_dir = Path(os.getenv("DATA_DIR", "/data"))
-                data_dir.mkdir(parents=True, exist_ok=True)
-                (data_dir / "last_fetch.html").write_text(html, encoding="utf-8")
-            parsed_list = scraper.parse_results(html)
-            return url, parsed_list
-        except Exception as exc:  # noqa: BLE001
-            last_error = str(exc)
-            log_event(logging.WARNING, "scrape_source_failed", source=url, error=last_error)
+    queue = list(candidates)
+    pending: dict[Future[tuple[list[dict[str, str]], CacheEntry | None, bytes | None]], str] = {}
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        while queue or pending:
+            if queue:
+                url = queue.pop(0)
+                pending[executor.submit(_scrape_source, url)] = url
+                if MIRROR_HEDGE_DELAY_S <= 0:
+                    continue
+            done, _ = wait(
+                pending,
+                timeout=MIRROR_HEDGE_DELAY_S if queue else None,
+                return_when=FIRST_COMPLETED,
+            )
+            # If several finished together, prefer the higher-priority mirror.
+            for future in sorted(done, key=lambda f: candidates.index(pending[f])):
+                url = pending.pop(future)
+                try:
+                    return (url, *future.result())
+                except Exception as exc:  # noqa: BLE001
+                    last_error = str(exc)
+                    log_event(logging.WARNING, "scrape_source_failed", source=url, error=last_error)
+    finally:
+        # Don't block on losers; queued work is dropped, running fetches finish on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
 
     raise RuntimeError(f"all sources failed; last_error={last_error}")
 
 
-def _within_backfill(draw_date: str, backfill_days: int) -> bool:
-    """Return True if draw_date is within backfill_days of today. If parse fails, allow insert."""
-    if backfill_days <= 0:
-        return True
-    try:
-        dt = datetime.datetime.strptime(draw_date, "%Y-%m-%d").date()
-    except ValueError:
-        return True
-    return dt >= (datetime.date.today() - datetime.timedelta(days=backfill_days))
-
-
 def main() -> int:
-    # Optional: wipe DB on startup to re-play all results (controlled via env)
-    if os.getenv("RESET_DB_ON_START") == "1":
-        db_path = db.get_db_path()
-        try:
-            db_path.unlink()
-            log_event(logging.WARNING, "db_reset", path=str(db_path))
-        except FileNotFoundError:
-            pass
     db.init_db()
-    retention_days = int(os.getenv("RETENTION_DAYS", "60"))
-    backfill_days = int(os.getenv("BACKFILL_DAYS", "1"))
+    # Optional: wipe DB on startup to re-play all results (controlled via env)
+    if RESET_DB_ON_START:
+        db.reset_db()
+        log_event(logging.WARNING, "db_reset")
+    db.migrate_signatures(scraper.compute_signature)
     try:
-        source_url, results = scrape_with_fallback()
+        source_url, results, cache_entry, body = scrape_with_fallback()
     except Exception as exc:  # noqa: BLE001
         log_event(logging.ERROR, "parse_failed", error=str(exc))
         return 0  # don't fail the container; try again next run
+    if SAVE_HTML and body is not None:
+        _save_html(body)
 
 
     # Only keep results for today (and optionally tomorrow)
@@ -101,29 +166,29 @@ def main() -> int:
     allowed_dates = {today, tomorrow}
     results = [r for r in results if r.get("draw_date") in allowed_dates]
 
-    # Default: send only newest; set SEND_ALL_RESULTS=1 to send all parsed draws
-
+    # One transaction for the whole page; only rows that were actually new get announced.
+    inserted_flags = db.insert_results(source_url, results)
+    if cache_entry:
+        # Only now is the page safely stored; if the insert had failed, the next run re-fetches it.
+        db.save_http_cache(source_url, *cache_entry)
     # Send newest-first (page order is already newest first for KolkataFF)
-    new_count = 0
-    for parsed in results:
-        draw_time = parsed.get("draw_time") or None
-        inserted = db.insert_result(
-            source=source_url,
-            draw_date=parsed["draw_date"],
-            draw_time=draw_time,
-            result_text=parsed["result_text"],
-            signature=parsed["signature"],
-        )
-        if inserted:
-            new_count += 1
-            message = format_message(parsed["draw_date"], draw_time, parsed["result_text"])
-            result = telegram.send_message(message)
+    messages = [
+        format_message(parsed["draw_date"], parsed.get("draw_time") or None, parsed["result_text"])
+        for parsed, inserted in zip(results, inserted_flags)
+        if inserted
+    ]
+    new_count = len(messages)
+
+    if messages:
+        # Imported only when there is something to announce; most runs have nothing new.
+        import telegram
+
+        # Paced to Telegram's per-chat limit so first-run bursts don't hit flood control
+        for result in telegram.send_many(messages):
             if result.get("ok") is not True:
                 log_event(logging.WARNING, "telegram_not_sent", details=result)
-            # Avoid hitting Telegram flood limits on first-run bursts
-            time.sleep(1)
 
-    db.cleanup_old(retention_days)
+    db.cleanup_old(RETENTION_DAYS)
 
     if new_count:
         log_event(logging.INFO, "results_inserted", count=new_count)
@@ -5,70 +5,211 @@ import json
 import logging
 import os
 import re
-import time
+import calendar
+import codecs
 import datetime
-from typing import Any, Dict, Optional, Tuple, List
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple, List, Union
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional C parser; BeautifulSoup handles everything without it
+    LexborHTMLParser = None
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# Probed once without importing it; lxml only matters if the BeautifulSoup path runs.
+_SOUP_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
 
 LOGGER = logging.getLogger("kolkataff.scraper")
-logging.basicConfig(level=logging.INFO, format="%(message)s")
+_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
 
 USER_AGENT = "KolkataFFScraper/1.0 (+https://railway.app)"
-DATE_PATTERNS = [
-    re.compile(r"(\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4})", re.IGNORECASE),  # e.g. 21 January 2026
-    re.compile(r"(\d{4}-\d{2}-\d{2})"),
-    re.compile(r"(\d{2}-\d{2}-\d{4})"),
-    re.compile(r"(\d{2}/\d{2}/\d{4})"),
-]
-TIME_PATTERN = re.compile(r"(\d{1,2}:\d{2})")
-RESULT_PATTERN = re.compile(r"(?i)result\s*[:\-]?\s*([A-Za-z0-9\- ]{2,})")
+FETCH_MAX_RETRIES = 3
+# urllib3 sleeps for whatever Retry-After a server sends; a cron run must not stall on an hour-long one.
+RETRY_AFTER_CAP_S = 10.0
+SITE_URL = os.getenv("SITE_URL", "https://kolkataff.tv/")
+# Every supported date shape in one alternation, so each line is scanned once;
+# match.lastgroup names the shape that hit (see _date_from_match).
+DATE_PATTERN = re.compile(
+    # [^\S\n] is \s minus newline: parse_results scans the joined page, and a date must not span lines.
+    r"(?P<mname>\d{1,2}[^\S\n]+[A-Za-z]{3,9}[^\S\n]+\d{4})"  # e.g. 21 January 2026
+    r"|(?P<iso>\d{4}-\d{2}-\d{2})"
+    r"|(?P<dash>\d{2}-\d{2}-\d{4})"
+    r"|(?P<slash>\d{2}/\d{2}/\d{4})"
+)
+# Month-name dates are normalized by lookup instead of strptime; keys are lowercase full and short names.
+_MONTH_DATE_RE = re.compile(r"(\d{1,2})\s+([A-Za-z]{3,9})\s+(\d{4})")
+_MONTHS = {name.lower(): idx for idx, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({abbr.lower(): idx for idx, abbr in enumerate(calendar.month_abbr) if abbr})
+# DATE_PATTERN, the number tokens and line breaks in one alternation, for parse_results'
+# single pass over the page. Dates are tried first at each position, and a triple that
+# is really the start of a date ("123 January 2026" holds "23 January 2026") yields to
+# it, so headings are exactly the lines where DATE_PATTERN.search would hit. Digit tokens
+# are ASCII (the site never uses other numerals, and the engine skips Unicode category
+# lookups); the date part stays Unicode so \s still matches non-breaking spaces in dates.
+_PAGE_TOKEN_PATTERN = re.compile(
+    DATE_PATTERN.pattern
+    + r"|(?P<triple>(?a:\b\d{3}\b)(?![^\S\n]+[A-Za-z]{3,9}[^\S\n]+\d{4}|-\d{2}-\d{4}|/\d{2}/\d{4}))"
+    + r"|(?P<single>(?a:\b\d\b))"
+    + r"|(?P<newline>\n)"
+)
+_DIGITS = frozenset("0123456789")
 # Schedule defaults: first draw 10:20, then every 90 minutes, 8 draws/day.
 DEFAULT_FIRST_DRAW = "10:20"
 DEFAULT_DRAW_INTERVAL_MIN = 90
 DEFAULT_DRAWS_PER_DAY = 8
+# Legacy single-result containers, most specific first. Order is priority, not document
+# order: a combined "a, b, ..." query would surface wrappers like <main> before .latest-result.
+FALLBACK_SELECTORS = (
+    ".latest-result",
+    ".latest",
+    ".result",
+    ".results",
+    "#latest-result",
+    "#result",
+    "#results",
+    "main",
+    "article",
+    ".entry-content",
+)
 
 
 def log_event(level: int, message: str, **fields: Any) -> None:
-    payload = {"message": message, **fields}
-    LOGGER.log(level, json.dumps(payload, ensure_ascii=False))
+    if not LOGGER.isEnabledFor(level):
+        return
+    LOGGER.log(level, _ENCODE({"message": message, **fields}))
+
+
+class NotModified(Exception):
+    """The server answered a conditional GET with 304: the page is unchanged."""
+
 
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After only up to RETRY_AFTER_CAP_S."""
 
-def fetch_html(url: str, timeout_s: int = 15, max_retries: int = 3) -> str:
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_CAP_S)
+
+
+def _build_session() -> requests.Session:
+    """
+    One keep-alive session shared by every fetch (and every mirror), so repeat
+    requests skip DNS/TCP/TLS setup. urllib3 retries connection errors and
+    429/5xx with exponential backoff (and honours Retry-After, capped).
+    """
     session = requests.Session()
-    headers = {"User-Agent": USER_AGENT}
-    last_exc: Optional[Exception] = None
-    for attempt in range(1, max_retries + 1):
-        try:
-            response = session.get(url, headers=headers, timeout=timeout_s)
-            response.raise_for_status()
-            return response.text
-        except Exception as exc:  # noqa: BLE001
-            last_exc = exc
-            backoff = 2 ** (attempt - 1)
-            log_event(
-                logging.WARNING,
-                "fetch_failed",
-                attempt=attempt,
-                backoff_s=backoff,
-                error=str(exc),
-            )
-            time.sleep(backoff)
-    raise RuntimeError(f"Failed to fetch {url}: {last_exc}")
+    session.headers["User-Agent"] = USER_AGENT
+    retry = _CappedRetry(
+        total=FETCH_MAX_RETRIES,
+        backoff_factor=1,
+        # Spread out retries from the mirror threads and from back-to-back cron runs.
+        backoff_jitter=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+
+def _get(url: str, extra_headers: Dict[str, str], timeout_s: int) -> requests.Response:
+    try:
+        response = _SESSION.get(url, headers=extra_headers, timeout=timeout_s)
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        log_event(logging.WARNING, "fetch_failed", url=url, error=str(exc))
+        raise RuntimeError(f"Failed to fetch {url}: {exc}") from exc
+    return response
+
 
+def _declared_charset(response: requests.Response) -> Optional[str]:
+    """Charset from the Content-Type header, only when the server actually states one."""
+    if "charset=" not in response.headers.get("Content-Type", "").lower():
+        return None  # requests would otherwise report its ISO-8859-1 default for text/*
+    return response.encoding
 
+
+def _parser_input(body: bytes, charset: Optional[str]) -> Union[str, bytes]:
+    """
+    What to hand the HTML parser. lexbor takes no encoding option and reads bytes
+    as UTF-8, so a body declared in another charset is decoded here first; UTF-8
+    (or undeclared) bodies stay bytes and skip a Python-level decode.
+    """
+    if not charset:
+        return body
+    try:
+        if codecs.lookup(charset).name == "utf-8":
+            return body
+    except LookupError:
+        return body  # unknown label: same as undeclared
+    return body.decode(charset, errors="replace")
+
+
+def fetch_html(url: str, timeout_s: int = 15) -> Union[str, bytes]:
+    """
+    Page ready for parse_results: raw bytes for UTF-8 pages, text decoded with the
+    Content-Type charset otherwise. Skips requests' charset guessing on the body.
+    """
+    response = _get(url, {}, timeout_s)
+    return _parser_input(response.content, _declared_charset(response))
+
+
+def fetch_html_conditional(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    timeout_s: int = 15,
+) -> Tuple[bytes, Optional[str], Optional[str], Optional[str]]:
+    """
+    GET with If-None-Match / If-Modified-Since from a previous response.
+    Returns (raw body, declared charset, etag, last_modified) for the new body;
+    pass the charset to parse_results. Raises NotModified on 304.
+    """
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = _get(url, headers, timeout_s)
+    if response.status_code == 304:
+        raise NotModified(url)
+    return (
+        response.content,
+        _declared_charset(response),
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+    )
+
+
+@functools.lru_cache(maxsize=256)
 def _normalize_date(raw: str) -> str:
+    """Pages repeat the same few dates, so results are memoized."""
     cleaned = raw.strip()
-    # Handle month names (e.g. "28 January 2026" or uppercase)
-    for candidate in (cleaned, cleaned.title()):
-        try:
-            return datetime.datetime.strptime(candidate, "%d %B %Y").strftime("%Y-%m-%d")
-        except ValueError:
+    # Handle month names in any case (e.g. "28 January 2026", "28 JAN 2026")
+    match = _MONTH_DATE_RE.fullmatch(cleaned)
+    if match:
+        month = _MONTHS.get(match.group(2).lower())
+        if month:
             try:
-                return datetime.datetime.strptime(candidate, "%d %b %Y").strftime("%Y-%m-%d")
+                return datetime.date(int(match.group(3)), month, int(match.group(1))).isoformat()
             except ValueError:
-                pass
+                pass  # e.g. 31 February: same as strptime rejecting it
     # Handle slash-separated
     try:
         if "/" in cleaned:
@@ -85,216 +226,341 @@ def _normalize_date(raw: str) -> str:
     return cleaned
 
 
+def _date_from_match(match: re.Match[str]) -> str:
+    """YYYY-MM-DD for a DATE_PATTERN match, dispatching on which shape matched."""
+    kind = match.lastgroup
+    value = match.group(kind)
+    if kind == "iso":
+        return value
+    if kind == "mname":
+        return _normalize_date(value)
+    # dd-mm-yyyy or dd/mm/yyyy: fixed width, so slice instead of split
+    return f"{value[6:]}-{value[3:5]}-{value[:2]}"
+
+
+@functools.cache
+def _fallback_patterns() -> Tuple[re.Pattern[str], re.Pattern[str]]:
+    """
+    (time, number token) patterns for the selector fallback only, compiled on first use
+    so a normal run doesn't pay for them at import. The number token pattern yields
+    3-digit pattis in group 1 and single-digit results in group 2.
+    """
+    return (
+        re.compile(r"(\d{1,2}:\d{2})", re.ASCII),
+        re.compile(r"\b(\d{3})\b|\b(\d)\b", re.ASCII),
+    )
+
+
 def _extract_date_time(text: str) -> Tuple[Optional[str], Optional[str]]:
-    date_value = None
-    for pattern in DATE_PATTERNS:
-        match = pattern.search(text)
-        if match:
-            date_value = _normalize_date(match.group(1))
-            break
-    time_match = TIME_PATTERN.search(text)
+    match = DATE_PATTERN.search(text)
+    date_value = _date_from_match(match) if match else None
+    time_match = _fallback_patterns()[0].search(text)
     time_value = time_match.group(1) if time_match else None
     return date_value, time_value
 
 
+def _tokenize_numbers(lines: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Split out 3-digit and single-digit tokens, in page order, with one regex
+    scan per line. Line edges are word boundaries, so no joined copy is needed.
+    """
+    numbers: List[str] = []
+    singles: List[str] = []
+    finditer = _fallback_patterns()[1].finditer
+    for line in lines:
+        if _DIGITS.isdisjoint(line):
+            continue  # a C-level set scan is far cheaper than starting the regex
+        for match in finditer(line):
+            triple, single = match.groups()
+            if triple:
+                numbers.append(triple)
+            else:
+                singles.append(single)
+    return numbers, singles
+
+
 def _extract_result_pairs(lines: List[str]) -> Optional[List[str]]:
     """
-    KolkataFF.tv lists dates followed by alternating 3-digit numbers and single-digit values.
-    Build list like ['120-3', '140-5', ...]. If no single digits, just the 3-digit numbers.
+    KolkataFF.tv lists dates followed by alternating 3-digit numbers and single-digit values;
+    kolkataff.in puts a row of 3-digit numbers above a row of single digits. Both pair up by
+    position: ['120-3', '140-5', ...]. If no single digits, just the 3-digit numbers.
     """
-    joined = " ".join(lines)
-    numbers = re.findall(r"\b\d{3}\b", joined)
-    singles = re.findall(r"\b\d\b", joined)
+    return _pair_numbers(*_tokenize_numbers(lines))
+
+
+def _pair_numbers(numbers: List[str], singles: List[str]) -> Optional[List[str]]:
     if not numbers:
         return None
-    pairs: List[str] = []
-    for idx, num in enumerate(numbers):
-        if idx < len(singles):
-            pairs.append(f"{num}-{singles[idx]}")
-        else:
-            pairs.append(num)
+    # zip stops at the shorter list, so extra singles are ignored and unpaired numbers follow as-is.
+    pairs = [f"{num}-{single}" for num, single in zip(numbers, singles)]
+    pairs.extend(numbers[len(singles) :])
     return pairs
 
 
-def _extract_kolkataff_in_section(lines: List[str]) -> Optional[List[str]]:
+def _date_sections(text: str) -> Iterator[Tuple[str, List[str], List[str]]]:
     """
-    kolkataff.in structure:
-      Date
-      <maybe header line>
-      line with 3-digit numbers and dashes
-      line with single digits and dashes
+    Split the newline-joined page into (date, 3-digit tokens, single digits) sections
+    with one _PAGE_TOKEN_PATTERN scan. A line holding a date is a heading: its own
+    numbers don't count, and its section runs to the next heading. Consecutive headings
+    with the same date merge, keeping the later one, so a repeated banner doesn't leave
+    an empty section behind. Each section is yielded once the next different date (or
+    the end of the page) closes it, so callers wanting only the newest stop early.
     """
-    joined = " ".join(lines)
-    numbers = re.findall(r"\b\d{3}\b", joined)
-    singles = re.findall(r"\b\d\b", joined)
-    if not numbers:
-        return None
-    pairs: List[str] = []
-    for idx, num in enumerate(numbers):
-        suffix = singles[idx] if idx < len(singles) else None
-        if suffix and suffix not in ("-", "–"):
-            pairs.append(f"{num}-{suffix}")
-        else:
-            pairs.append(num)
-    return pairs if pairs else None
-
-
-def _make_soup(html: str) -> BeautifulSoup:
-    """Try lxml first for speed; fall back to built-in parser if unavailable."""
-    for parser in ("lxml", "html.parser"):
-        try:
-            return BeautifulSoup(html, parser)
-        except Exception:
+    current_date: Optional[str] = None  # None until the first heading
+    numbers: List[str] = []
+    singles: List[str] = []
+    line_numbers = line_singles = 0  # section sizes where the current line began
+    heading_line = False
+    for match in _PAGE_TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "newline":
+            heading_line = False
+            line_numbers, line_singles = len(numbers), len(singles)
+            continue
+        if heading_line:
+            continue  # only the first date on a line counts; the rest of it is ignored
+        if kind == "triple":
+            if current_date is not None:
+                numbers.append(match.group(kind))
             continue
-    # Final fallback (should rarely hit)
-    return BeautifulSoup(html, "html.parser")
+        if kind == "single":
+            if current_date is not None:
+                singles.append(match.group(kind))
+            continue
+        heading_line = True
+        date_value = _date_from_match(match)
+        if current_date is not None:
+            # Numbers earlier on this line belong to the heading, not the section above.
+            del numbers[line_numbers:]
+            del singles[line_singles:]
+            if current_date != date_value:
+                yield current_date, numbers, singles
+        current_date = date_value
+        numbers, singles = [], []
+    if current_date is not None:
+        yield current_date, numbers, singles
+
+
+def _make_soup(html: Union[str, bytes]) -> BeautifulSoup:
+    """lxml when installed for speed; otherwise the built-in parser."""
+    # Imported here: with selectolax installed, a cron run never loads bs4 at all.
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, _SOUP_PARSER)
+
+
+def _make_tree(html: Union[str, bytes]) -> Any:
+    """
+    Parse with selectolax (lexbor, C) when installed, else BeautifulSoup.
+    lexbor reads bytes as UTF-8; see _parser_input for other charsets.
+    The _page_lines/_node_text/_select helpers hide which one is in use.
+    """
+    if LexborHTMLParser is None:
+        return _make_soup(html)
+    tree = LexborHTMLParser(html)
+    # BeautifulSoup's get_text() ignores these; drop them so both paths see the same lines.
+    tree.strip_tags(["script", "style", "template"])
+    return tree
+
+
+def _node_text(node: Any) -> str:
+    if LexborHTMLParser is None:
+        return node.get_text("\n", strip=True)
+    return node.text(separator="\n", strip=True)
+
 
+def _page_lines(tree: Any) -> List[str]:
+    """Non-empty, stripped text lines of the whole page, in document order."""
+    if LexborHTMLParser is None:
+        # Walk BeautifulSoup's strings lazily instead of joining the page into one big string first.
+        return [s for string in tree.stripped_strings for line in string.split("\n") if (s := line.strip())]
+    # lexbor joins the text in C; one split is cheaper than visiting nodes from Python.
+    text = tree.root.text(separator="\n", strip=True)
+    return [s for line in text.split("\n") if (s := line.strip())]
 
-def _build_draw_times(count: int) -> List[str]:
+
+def _select(tree: Any, selector: str) -> List[Any]:
+    if LexborHTMLParser is None:
+        return tree.select(selector)
+    return tree.css(selector)
+
+
+def _build_draw_times(count: int) -> Tuple[str, ...]:
     """Generate draw times for the day based on env or defaults."""
-    first_str = os.getenv("FIRST_DRAW_TIME", DEFAULT_FIRST_DRAW)
-    interval_min = int(os.getenv("DRAW_INTERVAL_MIN", str(DEFAULT_DRAW_INTERVAL_MIN)))
-    times: List[str] = []
+    return _draw_times(
+        count,
+        os.getenv("FIRST_DRAW_TIME", DEFAULT_FIRST_DRAW),
+        os.getenv("DRAW_INTERVAL_MIN", str(DEFAULT_DRAW_INTERVAL_MIN)),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _draw_times(count: int, first_str: str, interval_str: str) -> Tuple[str, ...]:
+    """
+    Memoized per (count, settings): every date section on a page asks for the
+    same schedule. Minutes are added as integers and wrap at midnight.
+    """
+    interval_min = int(interval_str)
     try:
         base = datetime.datetime.strptime(first_str, "%H:%M")
     except ValueError:
         base = datetime.datetime.strptime(DEFAULT_FIRST_DRAW, "%H:%M")
+    base_min = base.hour * 60 + base.minute
+    times: List[str] = []
     for idx in range(count):
-        t = base + datetime.timedelta(minutes=interval_min * idx)
-        times.append(t.strftime("%H:%M"))
-    return times
+        hour, minute = divmod((base_min + interval_min * idx) % 1440, 60)
+        times.append(f"{hour:02d}:{minute:02d}")
+    return tuple(times)
 
 
-def parse_results(html: str) -> List[Dict[str, str]]:
+def parse_results(html: Union[str, bytes], charset: Optional[str] = None) -> List[Dict[str, str]]:
     """
     Extract all date blocks with numbers from KolkataFF-style pages.
     Returns a list ordered as they appear on the page (typically newest first).
     Falls back to generic parsing if no date blocks are found.
+    charset is the Content-Type charset of a raw bytes body, if any.
     """
-    soup = _make_soup(html)
-    text = soup.get_text("\n", strip=True)
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    # Find date headings with their index positions
-    date_positions: List[Tuple[int, str]] = []
-    for idx, line in enumerate(lines):
-        date_value = None
-        for pattern in DATE_PATTERNS:
-            match = pattern.search(line)
-            if match:
-                date_value = _normalize_date(match.group(1))
-                break
-        if date_value:
-            date_positions.append((idx, date_value))
-
-    # Merge consecutive duplicate dates so sections aren't zero-length
-    merged_positions: List[Tuple[int, str]] = []
-    for idx, date_value in date_positions:
-        if merged_positions and merged_positions[-1][1] == date_value:
-            # keep the later index for the same date block
-            merged_positions[-1] = (idx, date_value)
-        else:
-            merged_positions.append((idx, date_value))
-
-    results: List[Dict[str, str]] = []
-    seen_signatures: set[str] = set()
+    if charset and isinstance(html, bytes):
+        html = _parser_input(html, charset)
+    return list(_iter_results(html))
 
-    # Walk date sections in order and collect ones that contain numbers
-    for pos, date_value in merged_positions:
-        next_pos = next((p for p, _ in merged_positions if p > pos), len(lines))
-        section = lines[pos + 1 : next_pos]
 
-        # kolkataff.in specific pairing
-        result_pairs = _extract_kolkataff_in_section(section)
-        if not result_pairs:
-            result_pairs = _extract_result_pairs(section)
+def _iter_results(html: Union[str, bytes]) -> Iterator[Dict[str, str]]:
+    """
+    parse_results as a generator: sections are tokenized and signed only as far as
+    the caller reads, so taking the newest result stops after the first date block.
+    Raises ValueError if nothing at all can be parsed.
+    """
+    tree = _make_tree(html)
+    # Headings and the numbers under them come out of a single regex pass over the page.
+    sections = _date_sections("\n".join(_page_lines(tree)))
+
+    found = False
+    # Plain tuples for in-page dedup; the digest is only computed for rows that are kept.
+    seen_keys: set[Tuple[str, str, str]] = set()
+
+    # Walk date sections in order and collect ones that contain numbers
+    for date_value, numbers, singles in sections:
+        result_pairs = _pair_numbers(numbers, singles)
 
         if result_pairs:
             times = _build_draw_times(len(result_pairs))
+            signature_base = _signature_prefix(date_value)
             for pair, draw_time in zip(result_pairs, times):
-                signature = compute_signature(date_value, draw_time, pair)
-                if signature in seen_signatures:
+                key = (date_value, draw_time, pair)
+                if key in seen_keys:
                     continue
-                seen_signatures.add(signature)
-                results.append(
-                    {
-                        "draw_date": date_value,
-                        "draw_time": draw_time,
-                        "result_text": pair,
-                        "signature": signature,
-                    }
-                )
-
-    if results:
-        return results
+                seen_keys.add(key)
+                found = True
+                yield {
+                    "draw_date": date_value,
+                    "draw_time": draw_time,
+                    "result_text": pair,
+                    "signature": _finish_signature(signature_base, draw_time, pair),
+                }
+
+    if found:
+        return
 
     # Fallback: use legacy selector-based parsing and return a single result if found
-    selectors = [
-        ".latest-result",
-        ".latest",
-        ".result",
-        ".results",
-        "#latest-result",
-        "#result",
-        "#results",
-        "main",
-        "article",
-        ".entry-content",
-    ]
-    candidates = []
-    for selector in selectors:
-        candidates.extend(soup.select(selector))
-    if not candidates:
-        candidates = [soup.body] if soup.body else []
-
-    for candidate in candidates:
-        c_text = candidate.get_text("\n", strip=True)
-        if not c_text:
-            continue
-        draw_date, draw_time = _extract_date_time(c_text)
-        result_pairs = _extract_result_pairs([c_text])
-        if draw_date and result_pairs:
-            times = _build_draw_times(len(result_pairs))
-            fallback_results: List[Dict[str, str]] = []
-            for pair, dt in zip(result_pairs, times):
-                signature = compute_signature(draw_date, dt, pair)
-                fallback_results.append(
-                    {
-                        "draw_date": draw_date,
-                        "draw_time": dt,
-                        "result_text": pair,
-                        "signature": signature,
-                    }
-                )
-            return fallback_results
+    # Selectors are queried one at a time so a hit on an early one skips the rest.
+    matched_any = False
+    for selector in FALLBACK_SELECTORS:
+        for candidate in _select(tree, selector):
+            matched_any = True
+            fallback_results = _parse_fallback_candidate(candidate)
+            if fallback_results:
+                log_event(logging.DEBUG, "fallback_selector_hit", selector=selector)
+                yield from fallback_results
+                return
+    if not matched_any and tree.body:
+        fallback_results = _parse_fallback_candidate(tree.body)
+        if fallback_results:
+            yield from fallback_results
+            return
 
     raise ValueError("Unable to parse latest result")
 
 
-def parse_latest_result(html: str) -> Dict[str, str]:
+def _parse_fallback_candidate(candidate: Any) -> List[Dict[str, str]]:
+    """Results from one fallback node, or an empty list if it has no date and numbers."""
+    c_text = _node_text(candidate)
+    if not c_text:
+        return []
+    draw_date, draw_time = _extract_date_time(c_text)
+    result_pairs = _extract_result_pairs([c_text])
+    if not (draw_date and result_pairs):
+        return []
+    times = _build_draw_times(len(result_pairs))
+    fallback_results: List[Dict[str, str]] = []
+    for pair, dt in zip(result_pairs, times):
+        signature = compute_signature(draw_date, dt, pair)
+        fallback_results.append(
+            {
+                "draw_date": draw_date,
+                "draw_time": dt,
+                "result_text": pair,
+                "signature": signature,
+            }
+        )
+    return fallback_results
+
+
+def parse_latest_result(html: Union[str, bytes]) -> Dict[str, str]:
     """Compatibility helper: return just the first parsed result."""
-    results = parse_results(html)
-    if not results:
+    latest = next(_iter_results(html), None)
+    if latest is None:
         raise ValueError("Unable to parse latest result")
-    return results[0]
+    return latest
 
 
 def fetch_results(site_url: Optional[str] = None) -> List[Dict[str, str]]:
     """Fetch HTML from a site and return all parsed results (page order)."""
-    url = site_url or os.getenv("SITE_URL", "https://kolkataff.tv/")
+    url = site_url or SITE_URL
     html = fetch_html(url)
     return parse_results(html)
 
 
+def fetch_results_multi(urls: List[str]) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Fetch several sites concurrently over the shared session, then parse each.
+    Maps url -> parsed results; a site that fails to fetch or parse is logged and left out.
+    """
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+        futures = {url: executor.submit(fetch_html, url) for url in urls}
+    results: Dict[str, List[Dict[str, str]]] = {}
+    for url, future in futures.items():
+        try:
+            results[url] = parse_results(future.result())
+        except Exception as exc:  # noqa: BLE001
+            log_event(logging.WARNING, "site_failed", url=url, error=str(exc))
+    return results
+
+
 def fetch_latest_result(site_url: Optional[str] = None) -> Dict[str, str]:
     """Fetch HTML from a site and return only the newest parsed result."""
-    url = site_url or os.getenv("SITE_URL", "https://kolkataff.tv/")
-    html = fetch_html(url)
-    results = parse_results(html)
-    if not results:
-        raise ValueError("Unable to parse latest result")
-    return results[0]
+    url = site_url or SITE_URL
+    return parse_latest_result(fetch_html(url))
 
 def compute_signature(draw_date: str, draw_time: Optional[str], result_text: str) -> str:
+    """
+    Dedup key for a draw: BLAKE2b-128 hex (32 chars). Not a security boundary,
+    so the shorter, faster digest is enough. Rows stored under the older SHA-256
+    form are rehashed by db.migrate_signatures.
+    """
     value = f"{draw_date}|{draw_time or ''}|{result_text}"
-    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _signature_prefix(draw_date: str) -> Any:
+    """compute_signature's hasher primed with the date, for many draws on one date."""
+    return hashlib.blake2b(f"{draw_date}|".encode("utf-8"), digest_size=16)
+
+
+def _finish_signature(prefix: Any, draw_time: Optional[str], result_text: str) -> str:
+    """Same value as compute_signature(draw_date, draw_time, result_text), via a copy of the primed hasher."""
+    hasher = prefix.copy()
+    hasher.update(f"{draw_time or ''}|{result_text}".encode("utf-8"))
+    return hasher.hexdigest()
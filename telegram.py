@@ -3,18 +3,40 @@ from __future__ import annotations
 import json
 import logging
 import os
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List
 
 import requests
 from requests import HTTPError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 LOGGER = logging.getLogger("kolkataff.telegram")
-logging.basicConfig(level=logging.INFO, format="%(message)s")
+_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# Telegram accepts roughly one message per second into a single chat.
+CHAT_MIN_INTERVAL_S = 1.0
+
+
+def _build_session() -> requests.Session:
+    """
+    Keep-alive session so a burst of messages shares one TLS connection.
+    Only connection failures are retried: re-POSTing after Telegram answered
+    could deliver a message twice, and 429s are handled by send_many.
+    """
+    session = requests.Session()
+    retry = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.5)
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry))
+    return session
+
+
+_SESSION = _build_session()
 
 
 def log_event(level: int, message: str, **fields: Any) -> None:
-    payload = {"message": message, **fields}
-    LOGGER.log(level, json.dumps(payload, ensure_ascii=False))
+    if not LOGGER.isEnabledFor(level):
+        return
+    LOGGER.log(level, _ENCODE({"message": message, **fields}))
 
 
 def send_message(message: str) -> Dict[str, Any]:
@@ -29,7 +51,7 @@ def send_message(message: str) -> Dict[str, Any]:
         "text": message,
         "disable_web_page_preview": True,
     }
-    response = requests.post(url, json=payload, timeout=15)
+    response = _SESSION.post(url, json=payload, timeout=15)
     try:
         response.raise_for_status()
     except HTTPError as exc:  # noqa: BLE001
@@ -40,8 +62,38 @@ def send_message(message: str) -> Dict[str, Any]:
             error=str(exc),
             response_text=response.text[:500],
         )
+        retry_after = None
+        if response.status_code == 429:
+            try:
+                retry_after = response.json().get("parameters", {}).get("retry_after")
+            except ValueError:
+                pass
         # Swallow Telegram errors so the fetch job still exits 0
-        return {"ok": False, "status": response.status_code, "error": str(exc)}
+        return {"ok": False, "status": response.status_code, "error": str(exc), "retry_after": retry_after}
 
     log_event(logging.INFO, "telegram_sent", status=response.status_code)
     return response.json()
+
+
+def send_many(messages: List[str]) -> List[Dict[str, Any]]:
+    """
+    Send messages in order, paced to the per-chat limit. The interval runs
+    from the start of the previous send, so its round-trip overlaps the wait
+    and nothing sleeps after the last message. A 429 is retried once after
+    the retry_after Telegram asks for.
+    """
+    results: List[Dict[str, Any]] = []
+    next_send_at = 0.0
+    for message in messages:
+        delay = next_send_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        started = time.monotonic()
+        result = send_message(message)
+        if result.get("status") == 429 and result.get("retry_after"):
+            time.sleep(result["retry_after"])
+            started = time.monotonic()
+            result = send_message(message)
+        next_send_at = started + CHAT_MIN_INTERVAL_S
+        results.append(result)
+    return results